@@ -1,53 +1,207 @@
 import asyncio
-import json
+import logging
+import os
+import sys
+from collections import deque
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Set
-from weakref import WeakSet
+from typing import Deque, List, Optional, Set
+from uuid import uuid4
 
+import orjson
 from aiohttp import web, WSMsgType, WSCloseCode
 
+try:
+    from redis.exceptions import RedisError
+except ImportError:
+    class RedisError(Exception):
+        pass
+
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = Path(__file__).parent.parent / 'static'
+INDEX_HTML = STATIC_DIR / 'index.html'
+
+EAGER_TASKS = sys.version_info >= (3, 12)
+
+PING_MESSAGE = '{"type":"ping"}'
+PONG_PREFIX = b'{"type":"pong","timestamp":"'
+PONG_SUFFIX = b'"}'
+
+
+def _dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+def _json_response(data, status: int = 200) -> web.Response:
+    return web.Response(
+        body=orjson.dumps(data),
+        status=status,
+        content_type='application/json'
+    )
+
 
 class NewsServer:
     
     def __init__(self):
-        self.websockets: Set[web.WebSocketResponse] = WeakSet()
+        self.websockets: Set[web.WebSocketResponse] = set()
         
-        self.news_history: list = []
         self.max_history = 100
+        self.news_history: Deque[orjson.Fragment] = deque(maxlen=self.max_history)
+        self._next_id = 1
          
         self.ping_interval = 30
+        self.max_msg_size = 4096
+        
+        self.clock_interval = 0.001
+        self._now_iso = datetime.now().isoformat()
+        
+        self.status_interval = 0.25
+        self._health_bytes = b''
+        self._stats_bytes = b''
+        self._render_status()
+        
+        self._background_tasks: list = []
+        self._send_tasks: Set[asyncio.Task] = set()
+        
+        self.batch_delay = 0.005
+        self._pending_news: List[orjson.Fragment] = []
+        self._flush_handle = None
+        
+        self.redis = None
+        self.news_channel = 'news'
+        self.news_id_key = 'news:next_id'
+        self.instance_id = uuid4().hex
+        self.redis_retry_min = 0.5
+        self.redis_retry_max = 30
+    
+    async def on_startup(self, app: web.Application):
+        self._background_tasks = [
+            asyncio.create_task(self._refresh_clock()),
+            asyncio.create_task(self._refresh_status()),
+        ]
+        if self.redis is not None:
+            self._background_tasks.append(
+                asyncio.create_task(self._subscribe_news())
+            )
+    
+    async def on_shutdown(self, app: web.Application):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_news()
+        
+        while self._send_tasks:
+            await asyncio.gather(*tuple(self._send_tasks), return_exceptions=True)
+    
+    async def on_cleanup(self, app: web.Application):
+        for task in self._background_tasks:
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks = []
+        
+        if self.redis is not None:
+            await self.redis.aclose()
+    
+    async def _refresh_clock(self):
+        while True:
+            self._now_iso = datetime.now().isoformat()
+            await asyncio.sleep(self.clock_interval)
+    
+    async def _refresh_status(self):
+        while True:
+            self._render_status()
+            await asyncio.sleep(self.status_interval)
+    
+    async def _subscribe_news(self):
+        delay = self.redis_retry_min
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.news_channel)
+                delay = self.redis_retry_min
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self._receive_remote_news(message['data'])
+            except (RedisError, OSError) as e:
+                logger.warning(
+                    'Redis subscription to %r lost, retrying in %.1fs: %s',
+                    self.news_channel, delay, e
+                )
+            finally:
+                try:
+                    await pubsub.aclose()
+                except (RedisError, OSError):
+                    pass
+            
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.redis_retry_max)
+    
+    def _receive_remote_news(self, raw: bytes):
+        try:
+            envelope = orjson.loads(raw)
+            origin_id = envelope['origin_id']
+            news_item = envelope['data']
+        except (orjson.JSONDecodeError, KeyError, TypeError):
+            logger.warning('Ignoring malformed message on %r', self.news_channel)
+            return
+        
+        if not isinstance(news_item, dict):
+            logger.warning('Ignoring malformed message on %r', self.news_channel)
+            return
+        
+        if origin_id != self.instance_id:
+            self._queue_news(orjson.Fragment(orjson.dumps(news_item)))
+    
+    def _render_status(self):
+        self._health_bytes = orjson.dumps({
+            'status': 'healthy',
+            'connected_clients': len(self.websockets),
+            'news_count': len(self.news_history),
+            'timestamp': self._now_iso
+        })
+        self._stats_bytes = orjson.dumps({
+            'connected_clients': len(self.websockets),
+            'total_news': len(self.news_history),
+            'recent_news': self.recent_news(5)
+        })
     
     async def websocket_handler(self, request: web.Request) -> web.WebSocketResponse:
-        ws = web.WebSocketResponse(heartbeat=self.ping_interval)
+        ws = web.WebSocketResponse(
+            heartbeat=self.ping_interval,
+            compress=False,
+            max_msg_size=self.max_msg_size
+        )
         await ws.prepare(request)
         
-        self.websockets.add(ws)
         client_id = id(ws)
         
+        self.websockets.add(ws)
         try:
             if self.news_history:
-                await ws.send_json({
-                    'type': 'history',
-                    'data': self.news_history[-10:]
-                })
+                await self._send_history(ws, 10)
             
             await ws.send_json({
                 'type': 'connected',
                 'message': 'Successfully connected to news server',
                 'client_id': client_id
-            })
+            }, dumps=_dumps)
             
             async for msg in ws:
                 if msg.type == WSMsgType.TEXT:
+                    if msg.data == PING_MESSAGE:
+                        await self._send_pong(ws)
+                        continue
+                    
                     try:
-                        data = json.loads(msg.data)
+                        data = orjson.loads(msg.data)
                         await self.handle_client_message(ws, data)
-                    except json.JSONDecodeError:
+                    except orjson.JSONDecodeError:
                         await ws.send_json({
                             'type': 'error',
                             'message': 'Invalid JSON format'
-                        })
+                        }, dumps=_dumps)
                 
                 elif msg.type == WSMsgType.PING:
                     pass
@@ -66,33 +220,43 @@ class NewsServer:
         
         return ws
     
+    def recent_news(self, count: int) -> list:
+        start = max(len(self.news_history) - count, 0)
+        return list(islice(self.news_history, start, None))
+    
     async def handle_client_message(self, ws: web.WebSocketResponse, data: dict):
         msg_type = data.get('type')
         
         if msg_type == 'ping':
-            await ws.send_json({
-                'type': 'pong',
-                'timestamp': datetime.now().isoformat()
-            })
+            await self._send_pong(ws)
         
         elif msg_type == 'get_history':
             count = min(data.get('count', 10), self.max_history)
-            await ws.send_json({
-                'type': 'history',
-                'data': self.news_history[-count:]
-            })
+            await self._send_history(ws, count)
         
         else:
             await ws.send_json({
                 'type': 'error',
                 'message': f'Unknown message type: {msg_type}'
-            })
+            }, dumps=_dumps)
+    
+    async def _send_history(self, ws: web.WebSocketResponse, count: int):
+        await ws.send_frame(orjson.dumps({
+            'type': 'history',
+            'data': self.recent_news(count)
+        }), WSMsgType.TEXT)
+    
+    async def _send_pong(self, ws: web.WebSocketResponse):
+        await ws.send_frame(
+            PONG_PREFIX + self._now_iso.encode() + PONG_SUFFIX,
+            WSMsgType.TEXT
+        )
     
     async def post_news(self, request: web.Request) -> web.Response:
         try:
-            data = await request.json()
-        except json.JSONDecodeError:
-            return web.json_response(
+            data = await request.json(loads=orjson.loads)
+        except orjson.JSONDecodeError:
+            return _json_response(
                 {'error': 'Invalid JSON'},
                 status=400
             )
@@ -101,94 +265,150 @@ class NewsServer:
         content = data.get('content')
         
         if not title or not content:
-            return web.json_response(
+            return _json_response(
                 {'error': 'Title and content are required'},
                 status=400
             )
         
-        news_item = {
-            'id': len(self.news_history) + 1,
-            'title': title,
-            'content': content,
-            'category': data.get('category', 'general'),
-            'timestamp': datetime.now().isoformat(),
-        }
-        
-        self.news_history.append(news_item)
-        if len(self.news_history) > self.max_history:
-            self.news_history = self.news_history[-self.max_history:]
+        try:
+            news_item = {
+                'id': await self._allocate_news_id(),
+                'title': title,
+                'content': content,
+                'category': data.get('category', 'general'),
+                'timestamp': datetime.now().isoformat(),
+            }
+            news_json = orjson.Fragment(orjson.dumps(news_item))
+            
+            if self.redis is not None:
+                await self.redis.publish(self.news_channel, orjson.dumps({
+                    'origin_id': self.instance_id,
+                    'data': news_json
+                }))
+        except (RedisError, OSError) as e:
+            logger.warning('Failed to publish news to Redis: %s', e)
+            return _json_response(
+                {'error': 'News could not be published, try again later'},
+                status=503
+            )
         
-        await self.broadcast_news(news_item)
+        self._queue_news(news_json)
         
-        return web.json_response({
+        return _json_response({
             'status': 'success',
             'news_id': news_item['id'],
-            'clients_notified': len(self.websockets)
+            'clients_connected': len(self.websockets)
         })
     
-    async def broadcast_news(self, news_item: dict):
-        if not self.websockets:
-            return
+    async def _allocate_news_id(self) -> int:
+        if self.redis is not None:
+            return await self.redis.incr(self.news_id_key)
         
-        message = {
-            'type': 'news',
-            'data': news_item
-        }
+        news_id = self._next_id
+        self._next_id += 1
+        return news_id
+    
+    def _queue_news(self, news_json: orjson.Fragment):
+        self.news_history.append(news_json)
+        self._pending_news.append(news_json)
+        self._schedule_flush()
+    
+    def _schedule_flush(self):
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.batch_delay, self._flush_news)
+    
+    def _flush_news(self):
+        self._flush_handle = None
+        news_items, self._pending_news = self._pending_news, []
+        
+        task = asyncio.create_task(self.broadcast_news(news_items))
+        self._send_tasks.add(task)
+        task.add_done_callback(self._on_send_done)
+    
+    async def broadcast_news(self, news_items: list):
+        if not self.websockets or not news_items:
+            return
         
-        tasks = []
-        disconnected = []
+        if len(news_items) == 1:
+            payload = orjson.dumps({
+                'type': 'news',
+                'data': news_items[0]
+            })
+        else:
+            payload = orjson.dumps({
+                'type': 'news_batch',
+                'data': news_items
+            })
         
-        for ws in self.websockets:
-            if ws.closed:
-                disconnected.append(ws)
-                continue
-            tasks.append(self.send_to_client(ws, message))
+        loop = asyncio.get_running_loop()
+        for ws in tuple(self.websockets):
+            coro = self.send_to_client(ws, payload)
+            if EAGER_TASKS:
+                task = asyncio.Task(coro, loop=loop, eager_start=True)
+            else:
+                task = loop.create_task(coro)
+            
+            if task.done():
+                self._on_send_done(task)
+            else:
+                self._send_tasks.add(task)
+                task.add_done_callback(self._on_send_done)
+    
+    def _on_send_done(self, task: asyncio.Task):
+        self._send_tasks.discard(task)
+        if task.cancelled():
+            return
         
-        for ws in disconnected:
+        exc = task.exception()
+        if exc is not None:
+            logger.error('Broadcast send failed', exc_info=exc)
+    
+    async def send_to_client(self, ws: web.WebSocketResponse, payload: bytes):
+        if ws.closed:
             self.websockets.discard(ws)
+            return
         
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    async def send_to_client(self, ws: web.WebSocketResponse, message: dict):
         try:
-            await ws.send_json(message)
-        except ConnectionResetError:
+            await ws.send_frame(payload, WSMsgType.TEXT)
+        except (ConnectionResetError, RuntimeError):
             self.websockets.discard(ws)
-            raise
     
     async def health_check(self, request: web.Request) -> web.Response:
-        return web.json_response({
-            'status': 'healthy',
-            'connected_clients': len(self.websockets),
-            'news_count': len(self.news_history),
-            'timestamp': datetime.now().isoformat()
-        })
+        return web.Response(
+            body=self._health_bytes,
+            content_type='application/json'
+        )
     
     async def get_stats(self, request: web.Request) -> web.Response:
-        return web.json_response({
-            'connected_clients': len(self.websockets),
-            'total_news': len(self.news_history),
-            'recent_news': self.news_history[-5:] if self.news_history else []
-        })
+        return web.Response(
+            body=self._stats_bytes,
+            content_type='application/json'
+        )
     
     async def index(self, request: web.Request) -> web.FileResponse:
-        static_dir = Path(__file__).parent.parent / 'static'
-        return web.FileResponse(static_dir / 'index.html')
+        return web.FileResponse(INDEX_HTML)
 
 
-def create_app() -> web.Application:
+def create_app(redis_url: Optional[str] = None) -> web.Application:
     app = web.Application()
     server = NewsServer()
     
+    if redis_url:
+        from redis import asyncio as aioredis
+        server.redis = aioredis.from_url(redis_url)
+    
     app.router.add_get('/', server.index)
     app.router.add_get('/ws', server.websocket_handler)
     app.router.add_post('/news', server.post_news)
     app.router.add_get('/health', server.health_check)
     app.router.add_get('/stats', server.get_stats)
     
-    static_dir = Path(__file__).parent.parent / 'static'
-    app.router.add_static('/static/', path=static_dir, name='static')
+    app.router.add_static('/static/', path=STATIC_DIR, name='static')
+    
+    app.on_startup.append(server.on_startup)
+    app.on_shutdown.append(server.on_shutdown)
+    app.on_cleanup.append(server.on_cleanup)
     
     app['news_server'] = server
     
@@ -196,5 +416,12 @@ def create_app() -> web.Application:
 
 
 if __name__ == '__main__':
-    app = create_app()
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
+    app = create_app(os.environ.get('REDIS_URL'))
     web.run_app(app, host='0.0.0.0', port=8081)
\ No newline at end of file
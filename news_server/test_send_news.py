@@ -1,5 +1,6 @@
 import asyncio
 import aiohttp
+import orjson
 import random
 
 NEWS_SAMPLES = [
@@ -31,20 +32,33 @@ NEWS_SAMPLES = [
 ]
 
 
+BURST_REPEAT = 200
+
+
+def _json_serialize(obj):
+    return orjson.dumps(obj).decode()
+
+
+def create_session():
+    connector = aiohttp.TCPConnector(limit=256, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, json_serialize=_json_serialize)
+
+
 async def send_news(session, news):
     async with session.post('http://localhost:8081/news', json=news) as response:
-        result = await response.json()
+        result = await response.json(loads=orjson.loads)
 
 
 async def main():
-    async with aiohttp.ClientSession() as session:
-        for news in NEWS_SAMPLES:
-            await send_news(session, news)
-            await asyncio.sleep(2)
+    async with create_session() as session:
+        await asyncio.gather(*[
+            send_news(session, news)
+            for news in NEWS_SAMPLES * BURST_REPEAT
+        ])
 
 
 async def send_single_news():
-    async with aiohttp.ClientSession() as session:
+    async with create_session() as session:
         news = random.choice(NEWS_SAMPLES)
         await send_news(session, news)
 